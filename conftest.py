@@ -1,12 +1,20 @@
+import os
+from fnmatch import fnmatch
 from unittest.mock import patch
 
 import pytest
-from dotenv import load_dotenv
 from kiln_ai.utils.config import Config
 
 
 @pytest.fixture(scope="session", autouse=True)
 def load_env():
+    # Skip reading .env when the environment is already populated (eg, in CI)
+    if os.environ.get("KILN_SKIP_DOTENV"):
+        return
+
+    # Imported here so collection-only runs don't pay for importing dotenv
+    from dotenv import load_dotenv
+
     load_dotenv()
 
 
@@ -40,11 +48,22 @@ def pytest_addoption(parser):
     )
 
 
-def is_single_manual_test(config, items) -> bool:
-    # Check if we're running manually (eg, in vscode)
-    if not config.getoption("--runsinglewithoutchecks"):
-        return False
+# Test modules named like this only contain paid tests. Without --runpaid they are
+# ignored at collection, so they're never imported (vs skipped after collection).
+PAID_TEST_MODULE_GLOBS = ["test_*_paid.py", "*_paid_test.py"]
+
+
+def pytest_ignore_collect(collection_path, config):
+    options = config.option
+    if options.runpaid or options.runsinglewithoutchecks:
+        return None
+    if any(fnmatch(collection_path.name, glob) for glob in PAID_TEST_MODULE_GLOBS):
+        return True
+    # Defer to pytest's default behaviour
+    return None
+
 
+def is_single_manual_test(items) -> bool:
     if len(items) == 1:
         return True
     if len(items) == 0:
@@ -60,20 +79,29 @@ def is_single_manual_test(config, items) -> bool:
 
 
 def pytest_collection_modifyitems(config, items):
-    # Always run test if it's a single test manually invoked
-    if is_single_manual_test(config, items):
+    # Read options once from the parsed namespace, rather than via getoption
+    options = config.option
+
+    # Always run test if it's a single test manually invoked (eg, in vscode)
+    if options.runsinglewithoutchecks and is_single_manual_test(items):
         return
 
-    # Mark tests that use paid services as skipped unless --runpaid is passed
-    if not config.getoption("--runpaid"):
-        skip_paid = pytest.mark.skip(reason="need --runpaid option to run")
-        for item in items:
-            if "paid" in item.keywords:
-                item.add_marker(skip_paid)
+    run_paid = options.runpaid
+    run_ollama = options.ollama
+    if run_paid and run_ollama:
+        return
 
+    # Mark tests that use paid services as skipped unless --runpaid is passed
     # Mark tests that use ollama server as skipped unless --ollama is passed
-    if not config.getoption("--ollama"):
-        skip_ollama = pytest.mark.skip(reason="need --ollama option to run")
-        for item in items:
-            if "ollama" in item.keywords:
-                item.add_marker(skip_ollama)
+    skip_paid = (
+        None if run_paid else pytest.mark.skip(reason="need --runpaid option to run")
+    )
+    skip_ollama = (
+        None if run_ollama else pytest.mark.skip(reason="need --ollama option to run")
+    )
+    for item in items:
+        keywords = item.keywords
+        if skip_paid is not None and "paid" in keywords:
+            item.add_marker(skip_paid)
+        if skip_ollama is not None and "ollama" in keywords:
+            item.add_marker(skip_ollama)
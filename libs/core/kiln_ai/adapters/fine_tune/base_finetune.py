@@ -1,3 +1,4 @@
+import functools
 from abc import ABC, abstractmethod
 from typing import Literal
 
@@ -128,9 +129,19 @@ class BaseFinetuneAdapter(ABC):
     def available_parameters(cls) -> list[FineTuneParameter]:
         """
         Returns a list of parameters that can be provided for this fine-tune. Includes hyperparameters, etc.
+
+        Must return the same parameters on every call: validate_parameters caches them per class.
         """
         return []
 
+    @classmethod
+    @functools.cache
+    def _available_parameters_by_name(cls) -> dict[str, FineTuneParameter]:
+        """
+        The available parameters for this fine-tune, keyed by name.
+        """
+        return {p.name: p for p in cls.available_parameters()}
+
     @classmethod
     def validate_parameters(
         cls, parameters: dict[str, str | int | float | bool]
@@ -139,35 +150,37 @@ class BaseFinetuneAdapter(ABC):
         Validate the parameters for this fine-tune.
         """
         # Check required parameters and parameter types
-        available_parameters = cls.available_parameters()
-        for parameter in available_parameters:
-            if not parameter.optional and parameter.name not in parameters:
-                raise ValueError(f"Parameter {parameter.name} is required")
-            elif parameter.name in parameters:
+        available_parameters = cls._available_parameters_by_name()
+        for name, parameter in available_parameters.items():
+            if not parameter.optional and name not in parameters:
+                raise ValueError(f"Parameter {name} is required")
+            elif name in parameters:
                 # check parameter is correct type
                 expected_type = TYPE_MAP[parameter.type]
-                value = parameters[parameter.name]
+                value = parameters[name]
 
                 # Strict type checking for numeric types
                 if expected_type is float and not isinstance(value, float):
                     raise ValueError(
-                        f"Parameter {parameter.name} must be a float, got {type(value)}"
+                        f"Parameter {name} must be a float, got {type(value)}"
                     )
                 elif expected_type is int and not isinstance(value, int):
                     raise ValueError(
-                        f"Parameter {parameter.name} must be an integer, got {type(value)}"
+                        f"Parameter {name} must be an integer, got {type(value)}"
                     )
                 elif not isinstance(value, expected_type):
                     raise ValueError(
-                        f"Parameter {parameter.name} must be type {expected_type}, got {type(value)}"
+                        f"Parameter {name} must be type {expected_type}, got {type(value)}"
                     )
 
-        allowed_parameters = [p.name for p in available_parameters]
         for parameter_key in parameters:
-            if parameter_key not in allowed_parameters:
+            if parameter_key not in available_parameters:
                 raise ValueError(f"Parameter {parameter_key} is not available")
 
+    # Only successful lookups are cached (invalid pairs raise). The cache reflects
+    # built_in_models at first lookup, so call cache_clear() if patching it in tests.
     @classmethod
+    @functools.lru_cache(maxsize=256)
     def check_valid_provider_model(
         cls, provider_id: str, provider_base_model_id: str
     ) -> None:
@@ -1,4 +1,4 @@
-from unittest.mock import Mock
+from types import SimpleNamespace
 
 import pytest
 
@@ -11,6 +11,10 @@ from kiln_ai.adapters.fine_tune.base_finetune import (
 from kiln_ai.datamodel import DatasetSplit, Task
 from kiln_ai.datamodel import Finetune as FinetuneModel
 
+# Keep this module on one worker so the session fixtures are only built once when
+# running in parallel: `pytest -n auto --dist=loadgroup` (requires pytest-xdist)
+pytestmark = pytest.mark.xdist_group("finetune_base")
+
 
 class MockFinetune(BaseFinetuneAdapter):
     """Mock implementation of BaseFinetune for testing"""
@@ -38,32 +42,68 @@ class MockFinetune(BaseFinetuneAdapter):
         ]
 
 
-@pytest.fixture
-def sample_task(tmp_path):
-    task_path = tmp_path / "task.kiln"
+BASE_KWARGS = dict(
+    provider_id="openai",
+    provider_base_model_id="gpt-4o-mini-2024-07-18",
+    train_split_name="train",
+    system_message="Test system message",
+)
+
+FINETUNE_KWARGS = dict(
+    name="test_finetune",
+    provider="test_provider",
+    provider_id="model_1234",
+    base_model_id="test_model",
+    train_split_name="train",
+    dataset_split_id="dataset-123",
+    system_message="Test system message",
+)
+
+
+class FakeDataset:
+    """Lightweight stand-in for DatasetSplit, exposing only what create_and_start uses"""
+
+    def __init__(self, id, parent_task, split_contents):
+        self.id = id
+        self._parent_task = parent_task
+        self.split_contents = split_contents
+
+    def parent_task(self):
+        return self._parent_task
+
+
+@pytest.fixture(scope="session")
+def sample_task(tmp_path_factory):
+    task_path = tmp_path_factory.mktemp("finetune") / "task.kiln"
     task = Task(
         name="Test Task",
         path=task_path,
         description="Test task for fine-tuning",
         instruction="Test instruction",
     )
-    task.save_to_file()
+    # Most tests only need the task path for finetune parent linkage, not the task
+    # file contents, so touch the file rather than serializing the task. Tests which
+    # load the task back from disk should use sample_task_persisted.
+    task_path.touch()
     return task
 
 
 @pytest.fixture
+def sample_task_persisted(tmp_path):
+    task = Task(
+        name="Test Task",
+        path=tmp_path / "task.kiln",
+        description="Test task for fine-tuning",
+        instruction="Test instruction",
+    )
+    task.save_to_file()
+    return task
+
+
+@pytest.fixture(scope="session")
 def basic_finetune(sample_task):
     return MockFinetune(
-        datamodel=FinetuneModel(
-            parent=sample_task,
-            name="test_finetune",
-            provider="test_provider",
-            provider_id="model_1234",
-            base_model_id="test_model",
-            train_split_name="train",
-            dataset_split_id="dataset-123",
-            system_message="Test system message",
-        ),
+        datamodel=FinetuneModel(parent=sample_task, **FINETUNE_KWARGS),
     )
 
 
@@ -98,62 +138,69 @@ def test_validate_parameters_valid():
     MockFinetune.validate_parameters(valid_params)  # Should not raise
 
 
-def test_validate_parameters_missing_required():
-    # Test missing required parameter
-    invalid_params = {
-        "learning_rate": 0.001,
+@pytest.mark.parametrize(
+    "invalid_params,expected_error",
+    [
         # missing required 'epochs'
-    }
-    with pytest.raises(ValueError, match="Parameter epochs is required"):
-        MockFinetune.validate_parameters(invalid_params)
-
-
-def test_validate_parameters_wrong_type():
-    # Test wrong parameter types
-    invalid_params = {
-        "learning_rate": "0.001",  # string instead of float
-        "epochs": 10,
-    }
-    with pytest.raises(ValueError, match="Parameter learning_rate must be a float"):
-        MockFinetune.validate_parameters(invalid_params)
-
-    invalid_params = {
-        "learning_rate": 0.001,
-        "epochs": 10.5,  # float instead of int
-    }
-    with pytest.raises(ValueError, match="Parameter epochs must be an integer"):
-        MockFinetune.validate_parameters(invalid_params)
-
-
-def test_validate_parameters_unknown_parameter():
-    # Test unknown parameter
-    invalid_params = {
-        "learning_rate": 0.001,
-        "epochs": 10,
-        "unknown_param": "value",
-    }
-    with pytest.raises(ValueError, match="Parameter unknown_param is not available"):
+        ({"learning_rate": 0.001}, "Parameter epochs is required"),
+        # string instead of float
+        (
+            {"learning_rate": "0.001", "epochs": 10},
+            "Parameter learning_rate must be a float",
+        ),
+        # float instead of int
+        (
+            {"learning_rate": 0.001, "epochs": 10.5},
+            "Parameter epochs must be an integer",
+        ),
+        # unknown parameter
+        (
+            {"learning_rate": 0.001, "epochs": 10, "unknown_param": "value"},
+            "Parameter unknown_param is not available",
+        ),
+    ],
+)
+def test_validate_parameters_invalid(invalid_params, expected_error):
+    with pytest.raises(ValueError, match=expected_error):
         MockFinetune.validate_parameters(invalid_params)
 
 
-@pytest.fixture
+def test_validate_parameters_cached_per_class():
+    class OtherMockFinetune(MockFinetune):
+        @classmethod
+        def available_parameters(cls) -> list[FineTuneParameter]:
+            return [
+                FineTuneParameter(
+                    name="batch_size",
+                    type="int",
+                    description="Batch size",
+                ),
+            ]
+
+    # Populate the cache for the parent class first, then ensure the subclass doesn't reuse it
+    MockFinetune.validate_parameters({"epochs": 10})
+    OtherMockFinetune.validate_parameters({"batch_size": 4})
+    with pytest.raises(ValueError, match="Parameter epochs is not available"):
+        OtherMockFinetune.validate_parameters({"epochs": 10})
+    with pytest.raises(ValueError, match="Parameter batch_size is not available"):
+        MockFinetune.validate_parameters({"epochs": 10, "batch_size": 4})
+
+
+@pytest.fixture(scope="session")
 def mock_dataset(sample_task):
-    dataset = Mock(spec=DatasetSplit)
-    dataset.id = "dataset_123"
-    dataset.parent_task.return_value = sample_task
-    dataset.split_contents = {"train": [], "validation": [], "test": []}
-    return dataset
+    return FakeDataset(
+        id="dataset_123",
+        parent_task=sample_task,
+        split_contents={"train": [], "validation": [], "test": []},
+    )
 
 
 async def test_create_and_start_success(mock_dataset):
     # Test successful creation with minimal parameters
     adapter, datamodel = await MockFinetune.create_and_start(
         dataset=mock_dataset,
-        provider_id="openai",
-        provider_base_model_id="gpt-4o-mini-2024-07-18",
-        train_split_name="train",
+        **BASE_KWARGS,
         parameters={"epochs": 10},  # Required parameter
-        system_message="Test system message",
     )
 
     assert isinstance(adapter, MockFinetune)
@@ -168,18 +215,21 @@ async def test_create_and_start_success(mock_dataset):
     assert datamodel.path.exists()
 
 
-async def test_create_and_start_with_all_params(mock_dataset):
-    # Test creation with all optional parameters
+async def test_create_and_start_with_all_params(sample_task_persisted):
+    # Test creation with all optional parameters. Uses a persisted task, as we load
+    # the finetune (and its parent) back from disk below.
+    dataset = FakeDataset(
+        id="dataset_123",
+        parent_task=sample_task_persisted,
+        split_contents={"train": [], "validation": [], "test": []},
+    )
     adapter, datamodel = await MockFinetune.create_and_start(
-        dataset=mock_dataset,
-        provider_id="openai",
-        provider_base_model_id="gpt-4o-mini-2024-07-18",
-        train_split_name="train",
+        dataset=dataset,
+        **BASE_KWARGS,
         parameters={"epochs": 10, "learning_rate": 0.001},
         name="Custom Name",
         description="Custom Description",
         validation_split_name="test",
-        system_message="Test system message",
     )
 
     assert datamodel.name == "Custom Name"
@@ -191,7 +241,10 @@ async def test_create_and_start_with_all_params(mock_dataset):
 
     # load the datamodel from the file, confirm it's saved
     loaded_datamodel = FinetuneModel.load_from_file(datamodel.path)
-    assert loaded_datamodel.model_dump_json() == datamodel.model_dump_json()
+    assert loaded_datamodel.model_dump() == datamodel.model_dump()
+    loaded_parent = loaded_datamodel.parent_task()
+    assert loaded_parent is not None
+    assert loaded_parent.id == sample_task_persisted.id
 
 
 async def test_create_and_start_invalid_parameters(mock_dataset):
@@ -199,50 +252,33 @@ async def test_create_and_start_invalid_parameters(mock_dataset):
     with pytest.raises(ValueError, match="Parameter epochs is required"):
         await MockFinetune.create_and_start(
             dataset=mock_dataset,
-            provider_id="openai",
-            provider_base_model_id="gpt-4o-mini-2024-07-18",
-            train_split_name="train",
+            **BASE_KWARGS,
             parameters={"learning_rate": 0.001},  # Missing required 'epochs'
-            system_message="Test system message",
-        )
-
-
-async def test_create_and_start_no_parent_task():
-    # Test with dataset that has no parent task
-    dataset = Mock(spec=DatasetSplit)
-    dataset.id = "dataset_123"
-    dataset.parent_task.return_value = None
-    dataset.split_contents = {"train": [], "validation": [], "test": []}
-
-    with pytest.raises(ValueError, match="Dataset must have a parent task with a path"):
-        await MockFinetune.create_and_start(
-            dataset=dataset,
-            provider_id="openai",
-            provider_base_model_id="gpt-4o-mini-2024-07-18",
-            train_split_name="train",
-            parameters={"epochs": 10},
-            system_message="Test system message",
         )
 
 
-async def test_create_and_start_no_parent_task_path():
-    # Test with dataset that has parent task but no path
-    task = Mock(spec=Task)
-    task.path = None
-
-    dataset = Mock(spec=DatasetSplit)
-    dataset.id = "dataset_123"
-    dataset.parent_task.return_value = task
-    dataset.split_contents = {"train": [], "validation": [], "test": []}
+@pytest.mark.parametrize(
+    "parent_task",
+    [
+        # dataset has no parent task
+        None,
+        # dataset has a parent task, but the task has no path
+        SimpleNamespace(path=None),
+    ],
+    ids=["no_parent_task", "parent_task_without_path"],
+)
+async def test_create_and_start_no_parent_task(parent_task):
+    dataset = FakeDataset(
+        id="dataset_123",
+        parent_task=parent_task,
+        split_contents={"train": [], "validation": [], "test": []},
+    )
 
     with pytest.raises(ValueError, match="Dataset must have a parent task with a path"):
         await MockFinetune.create_and_start(
             dataset=dataset,
-            provider_id="openai",
-            provider_base_model_id="gpt-4o-mini-2024-07-18",
-            train_split_name="train",
+            **BASE_KWARGS,
             parameters={"epochs": 10},
-            system_message="Test system message",
         )
 
 
@@ -255,36 +291,51 @@ def test_check_valid_provider_model():
         MockFinetune.check_valid_provider_model("openai", "gpt-99")
 
 
-async def test_create_and_start_invalid_train_split(mock_dataset):
+def test_check_valid_provider_model_cached():
+    # Valid pairs still return None on repeat calls
+    for _ in range(2):
+        assert (
+            MockFinetune.check_valid_provider_model("openai", "gpt-4o-mini-2024-07-18")
+            is None
+        )
+
+    # Exceptions are never cached, so invalid pairs raise on every call
+    for _ in range(2):
+        with pytest.raises(
+            ValueError, match="Provider openai with base model gpt-99 is not available"
+        ):
+            MockFinetune.check_valid_provider_model("openai", "gpt-99")
+
+
+async def test_create_and_start_invalid_train_split(mock_dataset, monkeypatch):
     # Test with an invalid train split name
-    mock_dataset.split_contents = {"valid_train": [], "valid_test": []}
+    monkeypatch.setattr(
+        mock_dataset, "split_contents", {"valid_train": [], "valid_test": []}
+    )
 
     with pytest.raises(
         ValueError, match="Train split invalid_train not found in dataset"
     ):
         await MockFinetune.create_and_start(
             dataset=mock_dataset,
-            provider_id="openai",
-            provider_base_model_id="gpt-4o-mini-2024-07-18",
-            train_split_name="invalid_train",  # Invalid train split
+            # Invalid train split
+            **(BASE_KWARGS | {"train_split_name": "invalid_train"}),
             parameters={"epochs": 10},
-            system_message="Test system message",
         )
 
 
-async def test_create_and_start_invalid_validation_split(mock_dataset):
+async def test_create_and_start_invalid_validation_split(mock_dataset, monkeypatch):
     # Test with an invalid validation split name
-    mock_dataset.split_contents = {"valid_train": [], "valid_test": []}
+    monkeypatch.setattr(
+        mock_dataset, "split_contents", {"valid_train": [], "valid_test": []}
+    )
 
     with pytest.raises(
         ValueError, match="Validation split invalid_test not found in dataset"
     ):
         await MockFinetune.create_and_start(
             dataset=mock_dataset,
-            provider_id="openai",
-            provider_base_model_id="gpt-4o-mini-2024-07-18",
-            train_split_name="valid_train",
+            **(BASE_KWARGS | {"train_split_name": "valid_train"}),
             validation_split_name="invalid_test",  # Invalid validation split
             parameters={"epochs": 10},
-            system_message="Test system message",
         )